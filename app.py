@@ -1,25 +1,46 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException, BackgroundTasks, Query
-from fastapi.responses import FileResponse, StreamingResponse
+from fastapi import FastAPI, File, UploadFile, HTTPException, BackgroundTasks, Query, Request, Response
+from fastapi.responses import FileResponse, ORJSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 import subprocess
 import os
 import uuid
-import json
+import orjson
 import shutil
 import psutil
 import signal
+import sqlite3
+import tempfile
+import logging
+import threading
+import stat
+import errno
+import mmap
 from datetime import datetime
 from pathlib import Path
 import asyncio
+import itertools
+import time
+from collections import Counter, OrderedDict
+from concurrent.futures import Future
+from queue import SimpleQueue
+import aiofiles
+
+try:
+    import liburing
+except ImportError:
+    liburing = None
 
 app = FastAPI(
     title="GROMACS API",
     description="All-in-one REST API for GROMACS molecular dynamics simulations",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
+logger = logging.getLogger("gromacs_api")
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -31,32 +52,305 @@ app.add_middleware(
 
 # Configuration
 WORK_DIR = os.getenv("WORK_DIR", "/data")
-JOBS_FILE = os.path.join(WORK_DIR, ".jobs.json")
+JOBS_FILE = os.path.join(WORK_DIR, ".jobs.json")  # Legacy store, migrated on startup
+JOBS_DB_FILE = os.path.join(WORK_DIR, ".jobs.db")
 TEMPLATES_DIR = os.path.join(WORK_DIR, ".templates")
 MAX_UPLOAD_SIZE = int(os.getenv("MAX_UPLOAD_SIZE", 100 * 1024 * 1024))  # 100MB
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1MB
+UPLOAD_FORM_OVERHEAD = 64 * 1024  # Allowance for multipart boundaries/headers
+UPLOAD_O_DIRECT = os.getenv("UPLOAD_O_DIRECT", "0") == "1" and hasattr(os, "O_DIRECT")
+DIRECT_IO_ALIGNMENT = 4096
+DOWNLOAD_CHUNK_SIZE = int(os.getenv("DOWNLOAD_CHUNK_SIZE", 8 * 1024 * 1024))  # 8MB
+TAIL_CHUNK_SIZE = 64 * 1024
+HAS_FADVISE = hasattr(os, "posix_fadvise")
+USE_URING = os.getenv("USE_URING", "0") == "1"
+URING_ENTRIES = 256
+URING_MAX_BATCH = 64  # Reads submitted per io_uring_enter()
 JOB_TIMEOUT = int(os.getenv("JOB_TIMEOUT", 3600))  # 1 hour
+JOBS_FLUSH_INTERVAL = 0.1  # Seconds to coalesce job updates before writing
+JOB_CACHE_SIZE = 500  # Finished job records kept in memory
+SSE_KEEPALIVE_INTERVAL = 15  # Seconds between keep-alive comments on event streams
+CPU_SAMPLE_INTERVAL = 5  # Seconds between background CPU samples for /metrics
+MDRUN_CONCURRENCY = int(os.getenv("MDRUN_CONCURRENCY", 1))
+JOB_CONCURRENCY = int(os.getenv("JOB_CONCURRENCY", os.cpu_count() or 1))
+METADATA_CACHE_SIZE = 256
+METADATA_CACHE_TTL = int(os.getenv("METADATA_CACHE_TTL", 3600))  # 1 hour
 
 # Ensure directories exist
 os.makedirs(WORK_DIR, exist_ok=True)
 os.makedirs(TEMPLATES_DIR, exist_ok=True)
 
 # Job storage
-running_processes: Dict[str, subprocess.Popen] = {}
+running_processes: Dict[str, asyncio.subprocess.Process] = {}
+cancelled_jobs: set = set()
+
+# Concurrency limits per GROMACS command; anything not listed shares the default
+job_semaphores: Dict[str, asyncio.Semaphore] = {
+    "mdrun": asyncio.Semaphore(MDRUN_CONCURRENCY)
+}
+default_job_semaphore = asyncio.Semaphore(JOB_CONCURRENCY)
+TERMINAL_STATUSES = ("completed", "failed", "cancelled")
+
+# Status event subscribers: job_id -> [(loop, queue), ...]; only touched on the event loop thread
+job_subscribers: Dict[str, List[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = {}
+
+def atomic_write(path: str, data: bytes):
+    """Write a file via temp file + rename so readers never see a torn write"""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp_")
+    try:
+        os.fchmod(fd, 0o644)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
 
 def load_jobs():
     if os.path.exists(JOBS_FILE):
         try:
-            with open(JOBS_FILE, 'r') as f:
-                return json.load(f)
-        except:
+            with open(JOBS_FILE, 'rb') as f:
+                return orjson.loads(f.read())
+        except (OSError, orjson.JSONDecodeError) as e:
+            backup = f"{JOBS_FILE}.corrupt-{datetime.utcnow().strftime('%Y%m%d%H%M%S')}"
+            logger.error("Could not load %s (%s); moving it to %s", JOBS_FILE, e, backup)
+            os.replace(JOBS_FILE, backup)
             return {}
     return {}
 
-def save_jobs(jobs):
-    with open(JOBS_FILE, 'w') as f:
-        json.dump(jobs, f, indent=2)
+JOB_COLUMNS = ("job_id", "job_name", "command", "args", "working_dir", "status",
+               "created_at", "started_at", "completed_at", "result")
+JSON_COLUMNS = ("args", "result")
+
+db_lock = threading.Lock()
+
+# Write-behind queue: job_id -> fields changed since the last flush
+pending_updates: Dict[str, Dict[str, Any]] = {}
+
+# Status index kept alongside the table so counts don't need a scan
+job_statuses: Dict[str, str] = {}
+status_counts: Counter = Counter()
+
+# LRU of recently read finished jobs; older ones are only kept in SQLite
+job_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+jobs_dirty = threading.Event()
+
+def init_jobs_db():
+    conn = sqlite3.connect(JOBS_DB_FILE, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS jobs (
+            job_id TEXT PRIMARY KEY,
+            job_name TEXT,
+            command TEXT,
+            args TEXT,
+            working_dir TEXT,
+            status TEXT,
+            created_at TEXT,
+            started_at TEXT,
+            completed_at TEXT,
+            result TEXT
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status_created ON jobs (status, created_at)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_created ON jobs (created_at)")
+    conn.commit()
+    return conn
+
+def _encode_job_fields(fields: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        key: orjson.dumps(value) if key in JSON_COLUMNS and value is not None else value
+        for key, value in fields.items()
+    }
+
+def _row_to_job(row: sqlite3.Row) -> Dict[str, Any]:
+    job = {}
+    for key in row.keys():
+        value = row[key]
+        if value is None:
+            continue
+        job[key] = orjson.loads(value) if key in JSON_COLUMNS else value
+    return job
+
+def db_insert_job(job: Dict[str, Any]):
+    fields = _encode_job_fields({key: job.get(key) for key in JOB_COLUMNS})
+    placeholders = ", ".join("?" for _ in JOB_COLUMNS)
+    with db_lock, jobs_conn:
+        jobs_conn.execute(
+            f"INSERT OR REPLACE INTO jobs ({', '.join(JOB_COLUMNS)}) VALUES ({placeholders})",
+            [fields[key] for key in JOB_COLUMNS]
+        )
+        job_cache.pop(job["job_id"], None)
+        _set_indexed_status(job["job_id"], job.get("status"))
+
+def _set_indexed_status(job_id: str, status: Optional[str]):
+    """Move a job between status buckets (status=None removes it); caller holds db_lock"""
+    old_status = job_statuses.pop(job_id, None)
+    if old_status is not None:
+        status_counts[old_status] -= 1
+    if status is not None:
+        job_statuses[job_id] = status
+        status_counts[status] += 1
+
+def load_status_index():
+    with db_lock:
+        job_statuses.clear()
+        job_statuses.update(jobs_conn.execute("SELECT job_id, status FROM jobs").fetchall())
+        status_counts.clear()
+        status_counts.update(job_statuses.values())
+
+def fail_orphaned_jobs():
+    """Mark jobs left queued/running by a previous server process as failed"""
+    result = orjson.dumps({"success": False, "output": "Server restarted", "returncode": -1})
+    with db_lock, jobs_conn:
+        cursor = jobs_conn.execute(
+            "UPDATE jobs SET status = 'failed', completed_at = ?, result = ? WHERE status IN ('queued', 'running')",
+            (datetime.utcnow().isoformat(), result)
+        )
+    if cursor.rowcount:
+        logger.warning("Marked %d queued/running jobs from a previous run as failed", cursor.rowcount)
+
+def db_update_job(job_id: str, **fields):
+    """Queue a job update; the writer thread coalesces and flushes it shortly after"""
+    with db_lock:
+        if job_id not in job_statuses:
+            # Job was deleted; don't resurrect it in the status index
+            return
+        pending_updates.setdefault(job_id, {}).update(fields)
+        job_cache.pop(job_id, None)
+        if "status" in fields:
+            _set_indexed_status(job_id, fields["status"])
+    jobs_dirty.set()
+    
+    if "status" in fields and job_subscribers.get(job_id):
+        notify_job_subscribers(job_id)
 
-jobs_db = load_jobs()
+def flush_job_updates():
+    """Write all queued job updates in a single transaction"""
+    with db_lock:
+        if not pending_updates:
+            return
+        updates = list(pending_updates.items())
+        pending_updates.clear()
+        with jobs_conn:
+            for job_id, fields in updates:
+                fields = _encode_job_fields(fields)
+                assignments = ", ".join(f"{key} = ?" for key in fields)
+                jobs_conn.execute(
+                    f"UPDATE jobs SET {assignments} WHERE job_id = ?",
+                    [*fields.values(), job_id]
+                )
+
+def notify_job_subscribers(job_id: str):
+    """Push the current job record to every /jobs/{job_id}/events stream"""
+    job = db_get_job(job_id)
+    if job is None:
+        # Deleted; close_job_subscribers() already ended the streams
+        return
+    for loop, queue in job_subscribers.get(job_id, []):
+        loop.call_soon_threadsafe(queue.put_nowait, job)
+
+def close_job_subscribers(job_id: str):
+    """Tell every /jobs/{job_id}/events stream that the job was deleted"""
+    for loop, queue in job_subscribers.pop(job_id, []):
+        loop.call_soon_threadsafe(queue.put_nowait, None)
+
+def _jobs_writer():
+    while True:
+        jobs_dirty.wait()
+        time.sleep(JOBS_FLUSH_INTERVAL)
+        jobs_dirty.clear()
+        try:
+            flush_job_updates()
+        except Exception:
+            logger.exception("Failed to flush job updates")
+
+def db_get_job(job_id: str) -> Optional[Dict[str, Any]]:
+    with db_lock:
+        if job_id in job_cache:
+            job_cache.move_to_end(job_id)
+            return job_cache[job_id]
+        
+        row = jobs_conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = _row_to_job(row)
+        
+        pending = pending_updates.get(job_id)
+        if pending:
+            job.update({key: value for key, value in pending.items() if value is not None})
+        elif job.get("status") in TERMINAL_STATUSES:
+            # Finished jobs no longer change, so keep recently read ones in memory
+            job_cache[job_id] = job
+            while len(job_cache) > JOB_CACHE_SIZE:
+                job_cache.popitem(last=False)
+    return job
+
+def db_delete_job(job_id: str) -> bool:
+    with db_lock, jobs_conn:
+        pending_updates.pop(job_id, None)
+        job_cache.pop(job_id, None)
+        _set_indexed_status(job_id, None)
+        cursor = jobs_conn.execute("DELETE FROM jobs WHERE job_id = ?", (job_id,))
+    return cursor.rowcount > 0
+
+def db_list_jobs(status: Optional[str] = None, limit: int = 100):
+    flush_job_updates()
+    where = "WHERE status = ?" if status else ""
+    params = (status,) if status else ()
+    with db_lock:
+        rows = jobs_conn.execute(
+            f"SELECT * FROM jobs {where} ORDER BY created_at DESC LIMIT ?",
+            (*params, limit)
+        ).fetchall()
+        total = jobs_conn.execute(f"SELECT COUNT(*) FROM jobs {where}", params).fetchone()[0]
+    return [_row_to_job(row) for row in rows], total
+
+def migrate_legacy_jobs():
+    """Import jobs from the old .jobs.json store, if present"""
+    legacy_jobs = load_jobs()
+    for job in legacy_jobs.values():
+        db_insert_job(job)
+    if os.path.exists(JOBS_FILE):
+        os.replace(JOBS_FILE, JOBS_FILE + ".migrated")
+
+jobs_conn = init_jobs_db()
+migrate_legacy_jobs()
+# Queued jobs only live in this process's BackgroundTasks, so none survive a restart
+fail_orphaned_jobs()
+load_status_index()
+threading.Thread(target=_jobs_writer, name="jobs-writer", daemon=True).start()
+
+# GROMACS installation info (fixed for the life of the container)
+GMX_BIN = shutil.which("gmx")
+GROMACS_OK = False
+GROMACS_VERSION_STR = "Unable to get GROMACS version"
+
+def probe_gromacs():
+    """Run `gmx --version` once and cache the result"""
+    global GMX_BIN, GROMACS_OK, GROMACS_VERSION_STR
+    GMX_BIN = shutil.which("gmx")
+    try:
+        result = subprocess.run(["gmx", "--version"], capture_output=True, text=True, timeout=5)
+        GROMACS_OK = result.returncode == 0
+        GROMACS_VERSION_STR = result.stdout
+    except Exception:
+        GROMACS_OK = False
+        GROMACS_VERSION_STR = "Unable to get GROMACS version"
+
+probe_gromacs()
+
+# Latest CPU utilisation, refreshed by sample_cpu()
+cpu_sample: Dict[str, float] = {"cpu_percent": 0.0}
+background_tasks_running: set = set()
+
+# Cache for `gmx help` and `gmx <command> -h` output
+metadata_cache: "OrderedDict[Tuple[str, Tuple[str, ...]], Tuple[float, Dict[str, Any]]]" = OrderedDict()
+metadata_cache_lock = threading.Lock()
 
 # Pydantic models
 class GromacsCommand(BaseModel):
@@ -74,10 +368,123 @@ class TemplateCreate(BaseModel):
     name: str = Field(..., description="Template filename")
     content: str = Field(..., description="Template content")
 
+class LargeFileResponse(FileResponse):
+    """FileResponse that reads in large chunks (trajectories can be several GB)"""
+    chunk_size = DOWNLOAD_CHUNK_SIZE
+
+class IoUringBatchEngine:
+    """Serve reads from many threads through one io_uring, batching them into few syscalls"""
+    
+    def __init__(self, entries: int = URING_ENTRIES, max_batch: int = URING_MAX_BATCH):
+        self.ring = liburing.Ring()
+        liburing.io_uring_queue_init(entries, self.ring)
+        self.cqe = liburing.Cqe()
+        self.max_batch = max_batch
+        self.requests: SimpleQueue = SimpleQueue()
+        threading.Thread(target=self._run, name="io-uring", daemon=True).start()
+    
+    def read(self, fd: int, size: int, offset: int) -> bytes:
+        """pread() via the ring; blocks the calling thread until the read completes"""
+        future: Future = Future()
+        self.requests.put((fd, bytearray(size), offset, future))
+        return future.result()
+    
+    def _run(self):
+        while True:
+            # Block for one request, then take whatever else is already waiting
+            batch = [self.requests.get()]
+            while len(batch) < self.max_batch and not self.requests.empty():
+                batch.append(self.requests.get())
+            
+            for index, (fd, buf, offset, _) in enumerate(batch):
+                sqe = liburing.io_uring_get_sqe(self.ring)
+                liburing.io_uring_prep_read(sqe, fd, buf, offset)
+                sqe.user_data = index
+            
+            try:
+                liburing.io_uring_submit(self.ring)
+            except OSError as e:
+                for *_, future in batch:
+                    future.set_exception(e)
+                continue
+            
+            # Reap one completion at a time; the binding's cqe[i] indexing doesn't wrap the CQ ring
+            for _ in batch:
+                liburing.io_uring_wait_cqe(self.ring, self.cqe)
+                cqe = self.cqe[0]
+                _, buf, _, future = batch[cqe.user_data]
+                try:
+                    future.set_result(bytes(memoryview(buf)[:cqe.res]))
+                except OSError as e:  # cqe.res was a negative errno
+                    future.set_exception(e)
+                finally:
+                    liburing.io_uring_cqe_seen(self.ring, cqe)
+
+def start_uring_engine() -> Optional[IoUringBatchEngine]:
+    """Create the io_uring engine if USE_URING=1 and the kernel allows it"""
+    if not USE_URING:
+        return None
+    if liburing is None:
+        logger.warning("USE_URING=1 but liburing is not installed; using POSIX reads")
+        return None
+    try:
+        return IoUringBatchEngine()
+    except OSError as e:
+        # e.g. io_uring disabled by the container's seccomp profile
+        logger.warning("io_uring unavailable (%s); using POSIX reads", e)
+        return None
+
+uring_engine = start_uring_engine()
+
 # Helper functions
+def iter_file_range(path: str, start: int, end: int):
+    """Yield the bytes of a file between start and end in DOWNLOAD_CHUNK_SIZE pieces"""
+    if uring_engine is not None:
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            pos = start
+            while pos < end:
+                chunk = uring_engine.read(fd, min(DOWNLOAD_CHUNK_SIZE, end - pos), pos)
+                if not chunk:
+                    break
+                pos += len(chunk)
+                yield chunk
+        finally:
+            os.close(fd)
+        return
+    
+    with open(path, 'rb') as f:
+        f.seek(start)
+        remaining = end - start
+        while remaining > 0:
+            chunk = f.read(min(DOWNLOAD_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+def read_tail_lines(path: str, count: int):
+    """Return the last `count` lines of a file without reading all of it"""
+    with open(path, 'rb') as f:
+        pos = f.seek(0, os.SEEK_END)
+        chunks = []
+        newlines = 0
+        # One extra newline guarantees the first kept line is complete
+        while pos > 0 and newlines <= count:
+            step = min(TAIL_CHUNK_SIZE, pos)
+            pos -= step
+            f.seek(pos)
+            chunk = f.read(step)
+            chunks.append(chunk)
+            newlines += chunk.count(b"\n")
+    
+    content_lines = b"".join(reversed(chunks)).splitlines(keepends=True)
+    truncated = pos > 0 or len(content_lines) > count
+    return [line.decode() for line in content_lines[-count:]], truncated
+
 def run_gromacs_sync(command: str, args: List[str], working_dir: str = ".", stdin_input: Optional[str] = None) -> Dict[str, Any]:
     """Execute a GROMACS command synchronously"""
-    full_cmd = ["gmx", command] + args
+    full_cmd = ("gmx", command, *args)
     work_path = os.path.join(WORK_DIR, working_dir)
     
     try:
@@ -111,59 +518,193 @@ def run_gromacs_sync(command: str, args: List[str], working_dir: str = ".", stdi
             "returncode": -1
         }
 
+def run_gromacs_cached(command: str, args: List[str]) -> Dict[str, Any]:
+    """Execute a read-only GROMACS help command, caching the result"""
+    key = (command, tuple(args))
+    now = time.monotonic()
+    
+    with metadata_cache_lock:
+        entry = metadata_cache.get(key)
+        if entry and now - entry[0] < METADATA_CACHE_TTL:
+            metadata_cache.move_to_end(key)
+            return entry[1]
+    
+    result = run_gromacs_sync(command, args)
+    
+    # Don't cache timeouts or failures to spawn gmx
+    if result["returncode"] != -1:
+        with metadata_cache_lock:
+            metadata_cache[key] = (now, result)
+            metadata_cache.move_to_end(key)
+            while len(metadata_cache) > METADATA_CACHE_SIZE:
+                metadata_cache.popitem(last=False)
+    
+    return result
+
+def _submit_job(
+    background_tasks: BackgroundTasks,
+    command: str,
+    args: List[str],
+    working_dir: str = ".",
+    stdin_input: Optional[str] = None,
+    job_name: Optional[str] = None
+) -> Dict[str, Any]:
+    """Record a queued job and schedule it; shared by /gromacs/execute and the workflows"""
+    job_id = str(uuid.uuid4())
+    job_name = job_name or f"{command}_{job_id[:8]}"
+    
+    db_insert_job({
+        "job_id": job_id,
+        "job_name": job_name,
+        "command": command,
+        "args": args,
+        "working_dir": working_dir,
+        "status": "queued",
+        "created_at": datetime.utcnow().isoformat()
+    })
+    
+    background_tasks.add_task(
+        run_job_background,
+        job_id,
+        command,
+        args,
+        working_dir,
+        stdin_input
+    )
+    
+    return {
+        "job_id": job_id,
+        "job_name": job_name,
+        "status": "queued",
+        "message": "Job submitted successfully"
+    }
+
+async def write_upload_buffered(file: UploadFile, file_path: str) -> int:
+    """Stream an upload to disk in chunks, enforcing MAX_UPLOAD_SIZE"""
+    total = 0
+    async with aiofiles.open(file_path, "wb") as out:
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            total += len(chunk)
+            if total > MAX_UPLOAD_SIZE:
+                raise HTTPException(status_code=413, detail="File too large")
+            await out.write(chunk)
+    return total
+
+def write_exact(fd: int, data: memoryview):
+    """os.write() that treats a short write as an error (O_DIRECT can't resume mid-block)"""
+    written = os.write(fd, data)
+    if written != len(data):
+        raise OSError(errno.EIO, f"Short write: {written} of {len(data)} bytes")
+
+async def write_upload_direct(file: UploadFile, file_path: str) -> int:
+    """Stream an upload to disk with O_DIRECT, bypassing the page cache"""
+    try:
+        fd = os.open(file_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_DIRECT, 0o644)
+    except OSError as e:
+        if e.errno != errno.EINVAL:
+            raise
+        # Filesystem doesn't support O_DIRECT (e.g. tmpfs)
+        return await write_upload_buffered(file, file_path)
+    
+    # Anonymous mmap memory is page-aligned, as O_DIRECT requires
+    buf = mmap.mmap(-1, UPLOAD_CHUNK_SIZE)
+    view = memoryview(buf)
+    filled = 0
+    total = 0
+    try:
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            total += len(chunk)
+            if total > MAX_UPLOAD_SIZE:
+                raise HTTPException(status_code=413, detail="File too large")
+            
+            pos = 0
+            while pos < len(chunk):
+                n = min(len(chunk) - pos, UPLOAD_CHUNK_SIZE - filled)
+                view[filled:filled + n] = chunk[pos:pos + n]
+                filled += n
+                pos += n
+                if filled == UPLOAD_CHUNK_SIZE:
+                    await asyncio.to_thread(write_exact, fd, view)
+                    filled = 0
+        
+        if filled:
+            # Writes must be whole blocks: pad the tail, then trim the file
+            padded = -(-filled // DIRECT_IO_ALIGNMENT) * DIRECT_IO_ALIGNMENT
+            view[filled:padded] = bytes(padded - filled)
+            with view[:padded] as tail:
+                await asyncio.to_thread(write_exact, fd, tail)
+            os.ftruncate(fd, total)
+    finally:
+        os.close(fd)
+        view.release()
+        buf.close()
+    
+    return total
+
 async def run_job_background(job_id: str, command: str, args: List[str], working_dir: str, stdin_input: Optional[str] = None):
-    """Background task for running GROMACS jobs"""
-    jobs_db[job_id]["status"] = "running"
-    jobs_db[job_id]["started_at"] = datetime.utcnow().isoformat()
-    save_jobs(jobs_db)
+    """Background task for running GROMACS jobs; waits (status "queued") for a free slot"""
+    async with job_semaphores.get(command, default_job_semaphore):
+        if job_id in cancelled_jobs or db_get_job(job_id) is None:
+            # Cancelled or deleted while still queued
+            cancelled_jobs.discard(job_id)
+            return
+        await _execute_job(job_id, command, args, working_dir, stdin_input)
+
+async def _execute_job(job_id: str, command: str, args: List[str], working_dir: str, stdin_input: Optional[str] = None):
+    db_update_job(job_id, status="running", started_at=datetime.utcnow().isoformat())
     
-    full_cmd = ["gmx", command] + args
+    full_cmd = ("gmx", command, *args)
     work_path = os.path.join(WORK_DIR, working_dir)
     log_file = os.path.join(WORK_DIR, f".job_{job_id}.log")
     
+    log_fd = None
     try:
-        with open(log_file, 'w') as log:
-            process = subprocess.Popen(
-                full_cmd,
-                cwd=work_path,
-                stdout=log,
-                stderr=subprocess.STDOUT,
-                text=True,
-                stdin=subprocess.PIPE if stdin_input else None
-            )
-            
-            running_processes[job_id] = process
-            
-            if stdin_input:
-                process.stdin.write(stdin_input)
-                process.stdin.close()
-            
-            returncode = process.wait(timeout=JOB_TIMEOUT)
-            
-            with open(log_file, 'r') as log:
-                output = log.read()
-            
-            jobs_db[job_id]["status"] = "completed" if returncode == 0 else "failed"
-            jobs_db[job_id]["completed_at"] = datetime.utcnow().isoformat()
-            jobs_db[job_id]["result"] = {
-                "success": returncode == 0,
-                "output": output,
-                "returncode": returncode
-            }
-            
-    except subprocess.TimeoutExpired:
+        log_fd = os.open(log_file, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o644)
+        if HAS_FADVISE:
+            os.posix_fadvise(log_fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        
+        process = await asyncio.create_subprocess_exec(
+            *full_cmd,
+            cwd=work_path,
+            stdout=log_fd,
+            stderr=asyncio.subprocess.STDOUT,
+            stdin=asyncio.subprocess.PIPE if stdin_input else None
+        )
+        
+        running_processes[job_id] = process
+        
+        if stdin_input:
+            process.stdin.write(stdin_input.encode())
+            await process.stdin.drain()
+            process.stdin.close()
+        
+        returncode = await asyncio.wait_for(process.wait(), JOB_TIMEOUT)
+        
+        # The log is the job's output; drop it from the page cache now that the job is done
+        if HAS_FADVISE:
+            os.posix_fadvise(log_fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        output_path = os.path.relpath(log_file, WORK_DIR)
+        
+        status = "completed" if returncode == 0 else "failed"
+        result = {
+            "success": returncode == 0,
+            "output_path": output_path,
+            "returncode": returncode
+        }
+        
+    except asyncio.TimeoutError:
         process.kill()
-        jobs_db[job_id]["status"] = "failed"
-        jobs_db[job_id]["completed_at"] = datetime.utcnow().isoformat()
-        jobs_db[job_id]["result"] = {
+        await process.wait()
+        status = "failed"
+        result = {
             "success": False,
-            "output": "Job timeout",
+            "output_path": os.path.relpath(log_file, WORK_DIR),
+            "error": "Job timeout",
             "returncode": -1
         }
     except Exception as e:
-        jobs_db[job_id]["status"] = "failed"
-        jobs_db[job_id]["completed_at"] = datetime.utcnow().isoformat()
-        jobs_db[job_id]["result"] = {
+        status = "failed"
+        result = {
             "success": False,
             "output": str(e),
             "returncode": -1
@@ -171,10 +712,55 @@ async def run_job_background(job_id: str, command: str, args: List[str], working
     finally:
         if job_id in running_processes:
             del running_processes[job_id]
-        save_jobs(jobs_db)
+        if log_fd is not None:
+            os.close(log_fd)
+    
+    if job_id in cancelled_jobs:
+        # cancel_job already recorded the final status
+        cancelled_jobs.discard(job_id)
+        db_update_job(job_id, result=result)
+    else:
+        db_update_job(job_id, status=status, completed_at=datetime.utcnow().isoformat(), result=result)
 
 # API Endpoints
 
+async def sample_cpu():
+    """Keep cpu_sample up to date without blocking requests on psutil's interval"""
+    psutil.cpu_percent(interval=None)  # Prime the counters
+    while True:
+        await asyncio.sleep(CPU_SAMPLE_INTERVAL)
+        cpu_sample["cpu_percent"] = psutil.cpu_percent(interval=None)
+
+@app.on_event("startup")
+async def start_cpu_sampler():
+    background_tasks_running.add(asyncio.create_task(sample_cpu()))
+
+def reprobe_gromacs():
+    """SIGHUP handler: re-run the GROMACS probe in a worker thread (e.g. after an in-place upgrade)"""
+    task = asyncio.create_task(asyncio.to_thread(probe_gromacs))
+    background_tasks_running.add(task)
+    task.add_done_callback(background_tasks_running.discard)
+
+@app.on_event("startup")
+async def install_sighup_handler():
+    if not hasattr(signal, "SIGHUP"):
+        return
+    try:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGHUP, reprobe_gromacs)
+    except (NotImplementedError, RuntimeError, ValueError):
+        # Not on the main thread (e.g. under a test client) or the loop lacks signal support
+        logger.info("SIGHUP re-probe not available in this event loop")
+
+@app.on_event("shutdown")
+async def stop_background_tasks():
+    for task in background_tasks_running:
+        task.cancel()
+    background_tasks_running.clear()
+
+@app.on_event("shutdown")
+def flush_jobs_on_shutdown():
+    flush_job_updates()
+
 @app.get("/")
 def root():
     return {
@@ -187,11 +773,7 @@ def root():
 
 @app.get("/health")
 def health_check():
-    try:
-        result = subprocess.run(["gmx", "--version"], capture_output=True, timeout=5)
-        gromacs_ok = result.returncode == 0
-    except:
-        gromacs_ok = False
+    gromacs_ok = GROMACS_OK and GMX_BIN is not None and os.access(GMX_BIN, os.X_OK)
     
     return {
         "status": "healthy" if gromacs_ok else "unhealthy",
@@ -201,60 +783,68 @@ def health_check():
 
 @app.get("/info")
 def system_info():
-    try:
-        result = subprocess.run(["gmx", "--version"], capture_output=True, text=True, timeout=5)
-        version_info = result.stdout
-    except:
-        version_info = "Unable to get GROMACS version"
-    
     return {
         "api_version": "1.0.0",
-        "gromacs_version": version_info,
+        "gromacs_version": GROMACS_VERSION_STR,
         "work_directory": WORK_DIR,
         "max_upload_size_mb": MAX_UPLOAD_SIZE / (1024 * 1024),
         "job_timeout_seconds": JOB_TIMEOUT
     }
 
 @app.get("/metrics")
-def system_metrics():
-    cpu_percent = psutil.cpu_percent(interval=1)
-    memory = psutil.virtual_memory()
-    disk = psutil.disk_usage(WORK_DIR)
+async def system_metrics():
+    memory = await asyncio.to_thread(psutil.virtual_memory)
+    disk = await asyncio.to_thread(psutil.disk_usage, WORK_DIR)
     
     return {
-        "cpu_percent": cpu_percent,
+        "cpu_percent": cpu_sample["cpu_percent"],
         "memory_percent": memory.percent,
         "memory_available_gb": memory.available / (1024**3),
         "disk_percent": disk.percent,
         "disk_free_gb": disk.free / (1024**3),
-        "active_jobs": len([j for j in jobs_db.values() if j.get("status") == "running"])
+        "active_jobs": status_counts["running"],
+        "queued_jobs": status_counts["queued"]
     }
 
 # File Management
 
 @app.post("/files/upload")
-async def upload_file(file: UploadFile, subdir: str = ""):
+async def upload_file(request: Request, file: UploadFile, subdir: str = ""):
     """Upload a file to the work directory"""
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > MAX_UPLOAD_SIZE + UPLOAD_FORM_OVERHEAD:
+        raise HTTPException(status_code=413, detail="File too large")
+
     try:
         target_dir = os.path.join(WORK_DIR, subdir)
         os.makedirs(target_dir, exist_ok=True)
-        
+
         file_path = os.path.join(target_dir, file.filename)
-        
-        content = await file.read()
-        
-        if len(content) > MAX_UPLOAD_SIZE:
-            raise HTTPException(status_code=413, detail="File too large")
-        
-        with open(file_path, "wb") as f:
-            f.write(content)
-        
+
+        # Write to a temp file so a failed upload never clobbers an existing file
+        fd, tmp_path = tempfile.mkstemp(dir=target_dir, prefix=".upload_")
+        try:
+            os.fchmod(fd, 0o644)
+            os.close(fd)
+            if UPLOAD_O_DIRECT:
+                total = await write_upload_direct(file, tmp_path)
+            else:
+                total = await write_upload_buffered(file, tmp_path)
+            os.replace(tmp_path, file_path)
+        except BaseException:
+            # Don't leave a partial file behind
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
         return {
             "success": True,
             "filename": file.filename,
             "path": os.path.join(subdir, file.filename) if subdir else file.filename,
-            "size": len(content)
+            "size": total
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -268,16 +858,17 @@ def list_files(subdir: str = ""):
             return {"files": [], "directory": subdir}
         
         files = []
-        for item in os.listdir(target_dir):
-            if item.startswith('.'):  # Skip hidden files
-                continue
-            item_path = os.path.join(target_dir, item)
-            files.append({
-                "name": item,
-                "type": "directory" if os.path.isdir(item_path) else "file",
-                "size": os.path.getsize(item_path) if os.path.isfile(item_path) else None,
-                "modified": datetime.fromtimestamp(os.path.getmtime(item_path)).isoformat()
-            })
+        with os.scandir(target_dir) as entries:
+            for entry in entries:
+                if entry.name.startswith('.'):  # Skip hidden files
+                    continue
+                st = entry.stat()
+                files.append({
+                    "name": entry.name,
+                    "type": "directory" if entry.is_dir() else "file",
+                    "size": st.st_size if entry.is_file() else None,
+                    "modified": datetime.fromtimestamp(st.st_mtime).isoformat()
+                })
         
         return {"files": files, "directory": subdir}
     except Exception as e:
@@ -288,16 +879,27 @@ def download_file(file_path: str):
     """Download a file"""
     full_path = os.path.join(WORK_DIR, file_path)
     
-    if not os.path.exists(full_path):
+    try:
+        stat_result = os.stat(full_path)
+    except FileNotFoundError:
         raise HTTPException(status_code=404, detail="File not found")
     
-    if not os.path.isfile(full_path):
+    if not stat.S_ISREG(stat_result.st_mode):
         raise HTTPException(status_code=400, detail="Path is not a file")
     
-    return FileResponse(full_path, filename=os.path.basename(file_path))
+    return LargeFileResponse(
+        full_path,
+        filename=os.path.basename(file_path),
+        media_type="application/octet-stream",
+        stat_result=stat_result
+    )
 
 @app.get("/files/view/{file_path:path}")
-def view_file(file_path: str, lines: int = Query(100, description="Number of lines to return")):
+def view_file(
+    file_path: str,
+    lines: int = Query(100, description="Number of lines to return"),
+    tail: bool = Query(False, description="Return the last lines instead of the first")
+):
     """View file content (for text files)"""
     full_path = os.path.join(WORK_DIR, file_path)
     
@@ -305,17 +907,29 @@ def view_file(file_path: str, lines: int = Query(100, description="Number of lin
         raise HTTPException(status_code=404, detail="File not found")
     
     try:
+        if tail and lines > 0:
+            content_lines, truncated = read_tail_lines(full_path, lines)
+            return {
+                "path": file_path,
+                "content": ''.join(content_lines),
+                "lines_shown": len(content_lines),
+                "truncated": truncated
+            }
+        
         with open(full_path, 'r') as f:
-            content_lines = f.readlines()
             if lines > 0:
-                content_lines = content_lines[:lines]
+                content_lines = list(itertools.islice(f, lines))
+                truncated = f.readline() != ""
+            else:
+                content_lines = f.readlines()
+                truncated = False
             content = ''.join(content_lines)
         
         return {
             "path": file_path,
             "content": content,
             "lines_shown": len(content_lines),
-            "truncated": lines > 0 and lines < len(content_lines)
+            "truncated": truncated
         }
     except UnicodeDecodeError:
         raise HTTPException(status_code=400, detail="File is not a text file")
@@ -345,40 +959,23 @@ def delete_file(file_path: str):
 @app.post("/gromacs/execute")
 async def execute_gromacs(cmd: GromacsCommand, background_tasks: BackgroundTasks):
     """Execute GROMACS command asynchronously"""
-    job_id = str(uuid.uuid4())
-    job_name = cmd.job_name or f"{cmd.command}_{job_id[:8]}"
-    
-    jobs_db[job_id] = {
-        "job_id": job_id,
-        "job_name": job_name,
-        "command": cmd.command,
-        "args": cmd.args,
-        "working_dir": cmd.working_dir,
-        "status": "queued",
-        "created_at": datetime.utcnow().isoformat()
-    }
-    save_jobs(jobs_db)
-    
-    background_tasks.add_task(
-        run_job_background,
-        job_id,
+    return _submit_job(
+        background_tasks,
         cmd.command,
         cmd.args,
         cmd.working_dir,
-        cmd.stdin_input
+        stdin_input=cmd.stdin_input,
+        job_name=cmd.job_name
     )
-    
-    return {
-        "job_id": job_id,
-        "job_name": job_name,
-        "status": "queued",
-        "message": "Job submitted successfully"
-    }
 
 @app.post("/gromacs/execute/sync")
 async def execute_gromacs_sync(cmd: GromacsCommand):
     """Execute GROMACS command synchronously"""
-    result = run_gromacs_sync(cmd.command, cmd.args, cmd.working_dir, cmd.stdin_input)
+    # Shares the background jobs' concurrency limits (e.g. MDRUN_CONCURRENCY)
+    async with job_semaphores.get(cmd.command, default_job_semaphore):
+        result = await asyncio.to_thread(
+            run_gromacs_sync, cmd.command, cmd.args, cmd.working_dir, cmd.stdin_input
+        )
     
     return {
         "command": cmd.command,
@@ -392,16 +989,16 @@ async def execute_gromacs_sync(cmd: GromacsCommand):
 @app.get("/gromacs/version")
 def gromacs_version():
     """Get GROMACS version"""
-    result = run_gromacs_sync("--version", [])
+    # Probed at startup (and on SIGHUP); no need to fork gmx per request
     return {
-        "success": result["success"],
-        "version": result["stdout"]
+        "success": GROMACS_OK,
+        "version": GROMACS_VERSION_STR
     }
 
 @app.get("/gromacs/commands")
 def list_gromacs_commands():
     """List available GROMACS commands"""
-    result = run_gromacs_sync("help", ["commands"])
+    result = run_gromacs_cached("help", ["commands"])
     return {
         "success": result["success"],
         "commands": result["stdout"]
@@ -410,7 +1007,7 @@ def list_gromacs_commands():
 @app.get("/gromacs/help/{command}")
 def gromacs_help(command: str):
     """Get help for specific GROMACS command"""
-    result = run_gromacs_sync(command, ["-h"])
+    result = run_gromacs_cached(command, ["-h"])
     return {
         "command": command,
         "success": result["success"],
@@ -422,79 +1019,167 @@ def gromacs_help(command: str):
 @app.get("/jobs")
 def list_jobs(status: Optional[str] = None, limit: int = 100):
     """List jobs with optional filtering"""
-    jobs_list = list(jobs_db.values())
-    
-    if status:
-        jobs_list = [j for j in jobs_list if j.get("status") == status]
-    
-    jobs_list = sorted(jobs_list, key=lambda x: x.get("created_at", ""), reverse=True)
+    jobs_list, total = db_list_jobs(status, limit)
     
-    return {"jobs": jobs_list[:limit], "total": len(jobs_list)}
+    return {"jobs": jobs_list, "total": total}
 
 @app.get("/jobs/{job_id}")
 def get_job(job_id: str):
     """Get job details"""
-    if job_id not in jobs_db:
+    job = db_get_job(job_id)
+    if job is None:
         raise HTTPException(status_code=404, detail="Job not found")
     
-    return jobs_db[job_id]
+    return job
 
 @app.delete("/jobs/{job_id}")
-def delete_job(job_id: str):
+async def delete_job(job_id: str):
     """Delete job from history"""
-    if job_id not in jobs_db:
+    # async so the subscriber list is only mutated on the event loop
+    if not db_delete_job(job_id):
         raise HTTPException(status_code=404, detail="Job not found")
+    close_job_subscribers(job_id)
     
     # Clean up log file
     log_file = os.path.join(WORK_DIR, f".job_{job_id}.log")
     if os.path.exists(log_file):
         os.remove(log_file)
     
-    del jobs_db[job_id]
-    save_jobs(jobs_db)
-    
     return {"success": True, "message": f"Job {job_id} deleted"}
 
 @app.post("/jobs/{job_id}/cancel")
-def cancel_job(job_id: str):
-    """Cancel a running job"""
-    if job_id not in jobs_db:
+async def cancel_job(job_id: str):
+    """Cancel a queued or running job"""
+    job = db_get_job(job_id)
+    if job is None:
         raise HTTPException(status_code=404, detail="Job not found")
     
-    if jobs_db[job_id]["status"] != "running":
+    if job["status"] == "queued":
+        cancelled_jobs.add(job_id)
+        db_update_job(job_id, status="cancelled", completed_at=datetime.utcnow().isoformat())
+        return {"success": True, "message": "Job cancelled"}
+    
+    if job["status"] != "running":
         raise HTTPException(status_code=400, detail="Job is not running")
     
     if job_id in running_processes:
         process = running_processes[job_id]
+        cancelled_jobs.add(job_id)
         process.terminate()
         try:
-            process.wait(timeout=5)
-        except:
+            await asyncio.wait_for(process.wait(), 5)
+        except asyncio.TimeoutError:
             process.kill()
         
-        jobs_db[job_id]["status"] = "cancelled"
-        jobs_db[job_id]["completed_at"] = datetime.utcnow().isoformat()
-        save_jobs(jobs_db)
+        db_update_job(job_id, status="cancelled", completed_at=datetime.utcnow().isoformat())
         
         return {"success": True, "message": "Job cancelled"}
     
     raise HTTPException(status_code=500, detail="Process not found")
 
 @app.get("/jobs/{job_id}/logs")
-def get_job_logs(job_id: str):
-    """Get job logs"""
-    if job_id not in jobs_db:
+def get_job_logs(
+    job_id: str,
+    offset: int = Query(0, ge=0, description="Byte offset to start reading from"),
+    tail: Optional[int] = Query(None, ge=0, description="Only return the last N bytes")
+):
+    """Stream job logs as plain text"""
+    if db_get_job(job_id) is None:
         raise HTTPException(status_code=404, detail="Job not found")
     
     log_file = os.path.join(WORK_DIR, f".job_{job_id}.log")
     
-    if not os.path.exists(log_file):
-        return {"job_id": job_id, "logs": "No logs available"}
+    try:
+        size = os.stat(log_file).st_size
+    except FileNotFoundError:
+        return PlainTextResponse("No logs available")
+    
+    start = min(offset, size)
+    if tail is not None:
+        start = max(start, size - tail)
+    
+    if start == 0:
+        status_code = 200
+        headers = {}
+    elif start < size:
+        status_code = 206
+        headers = {"Content-Range": f"bytes {start}-{size - 1}/{size}"}
+    else:
+        # Nothing past the requested offset (yet)
+        return Response(status_code=416, headers={"Content-Range": f"bytes */{size}"})
+    
+    # The log may still be growing; serve the bytes that exist right now
+    headers["Content-Length"] = str(size - start)
+    return StreamingResponse(
+        iter_file_range(log_file, start, size),
+        status_code=status_code,
+        media_type="text/plain",
+        headers=headers
+    )
+
+@app.get("/jobs/{job_id}/output")
+def get_job_output(job_id: str):
+    """Get the output of a finished job"""
+    job = db_get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    result = job.get("result")
+    if result is None:
+        raise HTTPException(status_code=404, detail="Job has no output yet")
+    
+    if "output_path" in result:
+        output_path = os.path.join(WORK_DIR, result["output_path"])
+        if not os.path.exists(output_path):
+            raise HTTPException(status_code=404, detail="Output file not found")
+        return LargeFileResponse(output_path, media_type="text/plain")
     
-    with open(log_file, 'r') as f:
-        logs = f.read()
+    # Error messages (and jobs recorded before output was spilled) are stored inline
+    return PlainTextResponse(result.get("output", ""))
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str):
+    """Stream job status changes as server-sent events until the job finishes"""
+    queue: asyncio.Queue = asyncio.Queue()
+    subscriber = (asyncio.get_running_loop(), queue)
+    # Subscribe before reading the job so no transition is missed in between
+    job_subscribers.setdefault(job_id, []).append(subscriber)
+    
+    def unsubscribe():
+        subscribers = job_subscribers.get(job_id, [])
+        if subscriber in subscribers:
+            subscribers.remove(subscriber)
+        if not subscribers:
+            job_subscribers.pop(job_id, None)
+    
+    job = db_get_job(job_id)
+    if job is None:
+        unsubscribe()
+        raise HTTPException(status_code=404, detail="Job not found")
     
-    return {"job_id": job_id, "logs": logs}
+    async def event_stream():
+        current = job
+        try:
+            yield f"event: status\ndata: {orjson.dumps(current).decode()}\n\n"
+            while current["status"] not in TERMINAL_STATUSES:
+                try:
+                    current = await asyncio.wait_for(queue.get(), SSE_KEEPALIVE_INTERVAL)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if current is None:
+                    deleted = {"job_id": job_id, "status": "deleted"}
+                    yield f"event: deleted\ndata: {orjson.dumps(deleted).decode()}\n\n"
+                    break
+                yield f"event: status\ndata: {orjson.dumps(current).decode()}\n\n"
+        finally:
+            unsubscribe()
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 # Workflow Endpoints
 
@@ -521,14 +1206,13 @@ async def workflow_pdb2gmx(
     if ignh:
         args.append("-ignh")
     
-    cmd = GromacsCommand(
-        command="pdb2gmx",
-        args=args,
-        working_dir=working_dir,
+    return _submit_job(
+        background_tasks,
+        "pdb2gmx",
+        args,
+        working_dir,
         job_name=f"pdb2gmx_{output_prefix}"
     )
-    
-    return await execute_gromacs(cmd, background_tasks)
 
 @app.post("/workflows/editconf")
 async def workflow_editconf(
@@ -552,14 +1236,13 @@ async def workflow_editconf(
         args.append("-center")
         args.extend(["0", "0", "0"])
     
-    cmd = GromacsCommand(
-        command="editconf",
-        args=args,
-        working_dir=working_dir,
+    return _submit_job(
+        background_tasks,
+        "editconf",
+        args,
+        working_dir,
         job_name=f"editconf_{output_file}"
     )
-    
-    return await execute_gromacs(cmd, background_tasks)
 
 @app.post("/workflows/solvate")
 async def workflow_solvate(
@@ -577,14 +1260,13 @@ async def workflow_solvate(
         "-o", output_file
     ]
     
-    cmd = GromacsCommand(
-        command="solvate",
-        args=args,
-        working_dir=working_dir,
+    return _submit_job(
+        background_tasks,
+        "solvate",
+        args,
+        working_dir,
         job_name=f"solvate_{output_file}"
     )
-    
-    return await execute_gromacs(cmd, background_tasks)
 
 @app.post("/workflows/genion")
 async def workflow_genion(
@@ -613,15 +1295,14 @@ async def workflow_genion(
     # Select SOL group (usually 13 or similar)
     stdin_input = "SOL\n"
     
-    cmd = GromacsCommand(
-        command="genion",
-        args=args,
-        working_dir=working_dir,
+    return _submit_job(
+        background_tasks,
+        "genion",
+        args,
+        working_dir,
         job_name=f"genion_{output_file}",
         stdin_input=stdin_input
     )
-    
-    return await execute_gromacs(cmd, background_tasks)
 
 @app.post("/workflows/grompp")
 async def workflow_grompp(
@@ -646,14 +1327,13 @@ async def workflow_grompp(
     if index_file:
         args.extend(["-n", index_file])
     
-    cmd = GromacsCommand(
-        command="grompp",
-        args=args,
-        working_dir=working_dir,
+    return _submit_job(
+        background_tasks,
+        "grompp",
+        args,
+        working_dir,
         job_name=f"grompp_{output_file}"
     )
-    
-    return await execute_gromacs(cmd, background_tasks)
 
 @app.post("/workflows/mdrun")
 async def workflow_mdrun(
@@ -672,14 +1352,13 @@ async def workflow_mdrun(
     if nsteps:
         args.extend(["-nsteps", str(nsteps)])
     
-    cmd = GromacsCommand(
-        command="mdrun",
-        args=args,
-        working_dir=working_dir,
+    return _submit_job(
+        background_tasks,
+        "mdrun",
+        args,
+        working_dir,
         job_name=f"mdrun_{output_prefix}"
     )
-    
-    return await execute_gromacs(cmd, background_tasks)
 
 @app.post("/workflows/energy")
 async def workflow_energy(
@@ -695,15 +1374,14 @@ async def workflow_energy(
         "-o", output_file
     ]
     
-    cmd = GromacsCommand(
-        command="energy",
-        args=args,
-        working_dir=working_dir,
+    return _submit_job(
+        background_tasks,
+        "energy",
+        args,
+        working_dir,
         job_name=f"energy_{output_file}",
         stdin_input=terms
     )
-    
-    return await execute_gromacs(cmd, background_tasks)
 
 @app.post("/workflows/trjconv")
 async def workflow_trjconv(
@@ -729,15 +1407,14 @@ async def workflow_trjconv(
     if center:
         args.append("-center")
     
-    cmd = GromacsCommand(
-        command="trjconv",
-        args=args,
-        working_dir=working_dir,
+    return _submit_job(
+        background_tasks,
+        "trjconv",
+        args,
+        working_dir,
         job_name=f"trjconv_{output_file}",
         stdin_input=selection
     )
-    
-    return await execute_gromacs(cmd, background_tasks)
 
 # Templates
 
@@ -745,12 +1422,13 @@ async def workflow_trjconv(
 def list_templates():
     """List available MDP templates"""
     templates = []
-    for item in os.listdir(TEMPLATES_DIR):
-        if item.endswith('.mdp'):
-            templates.append({
-                "name": item,
-                "path": os.path.join(TEMPLATES_DIR, item)
-            })
+    with os.scandir(TEMPLATES_DIR) as entries:
+        for entry in entries:
+            if entry.name.endswith('.mdp'):
+                templates.append({
+                    "name": entry.name,
+                    "path": entry.path
+                })
     return {"templates": templates}
 
 @app.get("/templates/{name}")
@@ -771,8 +1449,7 @@ async def create_template(template: TemplateCreate):
     """Create a custom template"""
     template_path = os.path.join(TEMPLATES_DIR, template.name)
     
-    with open(template_path, 'w') as f:
-        f.write(template.content)
+    atomic_write(template_path, template.content.encode())
     
     return {"success": True, "name": template.name, "path": template_path}
 
@@ -795,8 +1472,10 @@ async def create_workspace(workspace: WorkspaceCreate):
         "created_at": datetime.utcnow().isoformat()
     }
     
-    with open(os.path.join(workspace_path, ".metadata.json"), 'w') as f:
-        json.dump(metadata, f, indent=2)
+    atomic_write(
+        os.path.join(workspace_path, ".metadata.json"),
+        orjson.dumps(metadata, option=orjson.OPT_INDENT_2)
+    )
     
     return {"success": True, "workspace": workspace.name, "path": workspace_path}
 
@@ -804,16 +1483,17 @@ async def create_workspace(workspace: WorkspaceCreate):
 def list_workspaces():
     """List all workspaces"""
     workspaces = []
-    for item in os.listdir(WORK_DIR):
-        item_path = os.path.join(WORK_DIR, item)
-        if os.path.isdir(item_path) and not item.startswith('.'):
-            metadata_file = os.path.join(item_path, ".metadata.json")
-            if os.path.exists(metadata_file):
-                with open(metadata_file, 'r') as f:
-                    metadata = json.load(f)
+    with os.scandir(WORK_DIR) as entries:
+        for entry in entries:
+            if entry.name.startswith('.') or not entry.is_dir():
+                continue
+            metadata_file = os.path.join(entry.path, ".metadata.json")
+            try:
+                with open(metadata_file, 'rb') as f:
+                    metadata = orjson.loads(f.read())
                 workspaces.append(metadata)
-            else:
-                workspaces.append({"name": item, "created_at": None})
+            except FileNotFoundError:
+                workspaces.append({"name": entry.name, "created_at": None})
     
     return {"workspaces": workspaces}
 
@@ -831,4 +1511,4 @@ def delete_workspace(name: str):
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    uvicorn.run(app, host="0.0.0.0", port=8000, loop="uvloop", http="httptools")
\ No newline at end of file
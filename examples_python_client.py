@@ -1,17 +1,24 @@
 import requests
+from requests.adapters import HTTPAdapter
 import time
+import json
 import sys
 
 class GromacsAPI:
     def __init__(self, base_url="http://localhost:8000"):
         self.base_url = base_url
+        # Reuse TCP connections across calls (job polling makes many requests)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
     
     def upload_file(self, filepath, subdir=""):
         """Upload a file to the API"""
         with open(filepath, "rb") as f:
             files = {"file": f}
             params = {"subdir": subdir} if subdir else {}
-            response = requests.post(
+            response = self.session.post(
                 f"{self.base_url}/files/upload",
                 files=files,
                 params=params
@@ -27,13 +34,13 @@ class GromacsAPI:
         }
         
         if wait:
-            response = requests.post(
+            response = self.session.post(
                 f"{self.base_url}/gromacs/execute/sync",
                 json=data
             )
             return response.json()
         else:
-            response = requests.post(
+            response = self.session.post(
                 f"{self.base_url}/gromacs/execute",
                 json=data
             )
@@ -41,11 +48,16 @@ class GromacsAPI:
     
     def get_job_status(self, job_id):
         """Get job status"""
-        response = requests.get(f"{self.base_url}/jobs/{job_id}")
+        response = self.session.get(f"{self.base_url}/jobs/{job_id}")
         return response.json()
     
     def wait_for_job(self, job_id, poll_interval=2):
         """Wait for job to complete"""
+        status = self.stream_job_events(job_id)
+        if status is not None:
+            return status
+        
+        # Server doesn't support event streams (or the stream dropped), fall back to polling
         while True:
             status = self.get_job_status(job_id)
             print(f"Job {job_id}: {status['status']}")
@@ -55,16 +67,48 @@ class GromacsAPI:
             
             time.sleep(poll_interval)
     
+    def stream_job_events(self, job_id):
+        """Follow job status via server-sent events; returns None if unsupported or cut short"""
+        try:
+            response = self.session.get(f"{self.base_url}/jobs/{job_id}/events", stream=True)
+        except requests.RequestException:
+            return None
+        
+        with response:
+            if not response.headers.get("content-type", "").startswith("text/event-stream"):
+                return None
+            
+            try:
+                for line in response.iter_lines(decode_unicode=True):
+                    if not line or not line.startswith("data:"):
+                        continue
+                    status = json.loads(line[len("data:"):])
+                    print(f"Job {job_id}: {status['status']}")
+                    
+                    if status["status"] in ["completed", "failed", "cancelled", "deleted"]:
+                        return status
+            except requests.RequestException:
+                pass
+            
+            # Stream ended before the job finished (e.g. server restart); let the caller poll
+            return None
+    
+    def get_job_output(self, job_id):
+        """Get the output of a finished job"""
+        response = self.session.get(f"{self.base_url}/jobs/{job_id}/output")
+        return response.text if response.ok else None
+    
     def download_file(self, filepath, output_path):
         """Download a file from the API"""
-        response = requests.get(f"{self.base_url}/files/download/{filepath}")
-        with open(output_path, "wb") as f:
-            f.write(response.content)
+        with self.session.get(f"{self.base_url}/files/download/{filepath}", stream=True) as response:
+            with open(output_path, "wb") as f:
+                for chunk in response.iter_content(chunk_size=1024 * 1024):
+                    f.write(chunk)
         return output_path
     
     def run_workflow(self, workflow, **params):
         """Run a workflow endpoint"""
-        response = requests.post(
+        response = self.session.post(
             f"{self.base_url}/workflows/{workflow}",
             params=params
         )
@@ -104,4 +148,4 @@ if __name__ == "__main__":
         api.download_file("processed.top", "processed.top")
         print("Done!")
     else:
-        print(f"\nJob failed: {result.get('result', {}).get('output', 'Unknown error')}")
\ No newline at end of file
+        print(f"\nJob failed: {api.get_job_output(job_id) or 'Unknown error'}")
\ No newline at end of file